@@ -1,18 +1,33 @@
 #!/usr/bin/env python3
 
-import socket, serial, datetime, functools, threading, re, argparse, sys
+import socket, serial, datetime, threading, re, argparse, sys, time, contextlib
+import numpy as np
 
 def dprint(*args, **kwargs):
     print(datetime.datetime.now().isoformat(timespec='seconds') + ': ', end='')
     print(*args, **kwargs)
     sys.stdout.flush()
 
+# replies are 7-bit ASCII and matched as bytes, without decoding
+_RE_IDN   = re.compile(rb'([^,]*),([^,]*),SN:([^,]*),([^,]*)')
+_RE_TOKEN = re.compile(rb'(\S+)')
+_RE_FLOAT = re.compile(rb'([\d.]+)')
+_RE_INT   = re.compile(rb'(\d+)')
+_RE_OPC_ESR = re.compile(rb'(\d+)\s*;\s*(\d+)')
+_RE_OPC_ESR_MODE = re.compile(rb'(\d+)\s*;\s*(\d+)\s*;\s*(\S+)')
+
 def _locked_gpp(method):
     def inner(ref, *args, **kwargs):
         with ref.gpp.lock:
             return method(ref, *args, **kwargs)
     return inner
 
+def _batched_gpp(method):
+    def inner(ref, *args, **kwargs):
+        with ref.gpp._batch():
+            return method(ref, *args, **kwargs)
+    return inner
+
 class Monitor:
     @staticmethod
     def ABOVE(n):
@@ -34,10 +49,23 @@ class Monitor:
     TRIG_BEEPER = 4
 
 class Channel:
+    # (query, reply pattern, status key, reply conversion)
+    _STATUS_FIELDS = (
+        (":MODE{n}?",      _RE_TOKEN, 'mode',    lambda x: x[1].decode('ascii')),
+        (":SOUR{n}:CURR?", _RE_FLOAT, 'current', lambda x: float(x[1])),
+        (":SOUR{n}:VOLT?", _RE_FLOAT, 'voltage', lambda x: float(x[1])),
+        (":LOAD{n}:CV?",   _RE_TOKEN, 'load_cv', lambda x: x[1] == b'ON'),
+        (":LOAD{n}:CC?",   _RE_TOKEN, 'load_cc', lambda x: x[1] == b'ON'),
+        (":LOAD{n}:CR?",   _RE_TOKEN, 'load_cr', lambda x: x[1] == b'ON'),
+        (":OUTP{n}:STAT?", _RE_TOKEN, 'enabled', lambda x: x[1] == b'ON'),
+    )
+
     def __init__(self, gpp, n):
         self.gpp = gpp
         self.n = n
         self.mode = None  # last set: 'IND'/'CV'/'CC'/'CR', None if not yet established
+        self.status_ttl = 0  # seconds a status() result may be reused; 0 always re-reads
+        self._status_cache = None  # (monotonic time, status dict)
 
     def meas(self):
         return self.gpp.meas().asDict()[self.n]
@@ -46,101 +74,119 @@ class Channel:
     def get_mode(self):
         if self.mode is None:
             self.gpp._sendline(f":MODE{self.n}?")
-            self.mode = self.gpp._expect(r'(\S+)').group(1)
+            self.mode = self.gpp._expect(_RE_TOKEN).group(1).decode('ascii')
         return self.mode
     
+    # unlocked, for use from methods that already hold the lock
+    def _output(self, on):
+        self._status_cache = None
+        self.gpp._chain_wait([f":OUTP{self.n}:STAT {'ON' if on else 'OFF'}"])
+
     @_locked_gpp
     def disable(self):
-        self.gpp._sendline(f":OUTP{self.n}:STAT OFF")
-        self.gpp.wait()
+        self._output(False)
     
     @_locked_gpp
     def enable(self):
-        self.gpp._sendline(f":OUTP{self.n}:STAT ON")
-        self.gpp.wait()
+        self._output(True)
     
+    def _status_queries(self):
+        return [v[0].format(**self.__dict__) for v in self._STATUS_FIELDS]
+
+    def _parse_status(self, replies):
+        rv = {}
+        for v, reply in zip(self._STATUS_FIELDS, replies):
+            rv[v[2]] = v[3](v[1].search(reply))
+        return rv
+
+    # the cached status if it is younger than status_ttl, else None
+    def _cached_status(self, now):
+        if self._status_cache is not None and now - self._status_cache[0] < self.status_ttl:
+            return dict(self._status_cache[1])
+        return None
+
     # returns the configured state
-    @_locked_gpp
     def status(self):
-        rv = {}
-        vars_of_interest = (
-            (":MODE{n}?",      r'(\S+)',      'mode',    lambda x: x[1]),
-            (":SOUR{n}:CURR?", r'([\d\.]+)',  'current', lambda x: float(x[1])),
-            (":SOUR{n}:VOLT?", r'([\d\.]+)',  'voltage', lambda x: float(x[1])),
-            (":LOAD{n}:CV?",   r'(\S+)',      'load_cv', lambda x: x[1] == 'ON'),
-            (":LOAD{n}:CC?",   r'(\S+)',      'load_cc', lambda x: x[1] == 'ON'),
-            (":LOAD{n}:CR?",   r'(\S+)',      'load_cr', lambda x: x[1] == 'ON'),
-            (":OUTP{n}:STAT?", r'(\S+)',      'enabled', lambda x: x[1] == 'ON'),
-        )
-        for v in vars_of_interest:
-            self.gpp._sendline(v[0].format(**self.__dict__))
-            rv[v[2]] = v[3](self.gpp._expect(v[1]))
-
-        return rv                    
+        return self.gpp.status((self.n,))[self.n]
 
     # TODO: OVP/OCP
     @_locked_gpp
+    @_batched_gpp
     def set_source(self, voltage, current):
+        self._status_cache = None
         switching = self.mode != 'IND'
         if switching:
             # output off across the switch so a stale setpoint from the old
             # mode is never briefly driven in the new one
-            self.disable()
-            self.gpp._sendline("TRACK0")
+            self._output(False)
             if self.n == 1 or self.n == 2:
-                self.gpp._sendline(f":LOAD{self.n}:CC OFF")
-                self.gpp._sendline(f":LOAD{self.n}:CV OFF")
-            self.gpp.wait()
-            if self.n == 1 or self.n == 2:
-                self.gpp._sendline(f":MODE{self.n}?")
-                rv = self.gpp._expect(r'(\S+)')
-                if rv.group(1) != 'IND':
+                # the mode readback rides along after *OPC? so it reflects
+                # the state once the switch has completed
+                rv = self.gpp._send_chain([
+                    "TRACK0",
+                    f":LOAD{self.n}:CC OFF",
+                    f":LOAD{self.n}:CV OFF",
+                    "*OPC?",
+                    "*ESR?",
+                    f":MODE{self.n}?",
+                ], _RE_OPC_ESR_MODE)
+                self.gpp._opc_done(rv)
+                if rv.group(3) != b'IND':
                     raise RuntimeError('supply failed to switch to source mode')
+            else:
+                self.gpp._chain_wait(["TRACK0"])
             self.mode = 'IND'
-        self.gpp._sendline(f":SOUR{self.n}:CURR {current}")
-        self.gpp._sendline(f":SOUR{self.n}:VOLT {voltage}")
-        self.gpp.wait()
+        self.gpp._chain_wait([
+            f":SOUR{self.n}:CURR {current}",
+            f":SOUR{self.n}:VOLT {voltage}",
+        ])
         if switching:
-            self.enable()
+            self._output(True)
     
     @_locked_gpp
+    @_batched_gpp
     def set_load(self, cv = None, cc = None, cr = None):
         if (cv is None and cc is None and cr is None) or \
            (cv is not None and cc is not None) or \
            (cv is not None and cr is not None) or \
            (cc is not None and cr is not None):
             raise ValueError(f'supply can track only one of CV / CC / CR mode at a time {cc} {cv} {cr}')
+        self._status_cache = None
         mode = 'CV' if cv is not None else 'CC' if cc is not None else 'CR'
         switching = self.mode != mode
         if switching:
             # output off across the switch so a stale setpoint from the old
             # mode is never briefly driven in the new one
-            self.disable()
-            self.gpp._sendline(f":LOAD{self.n}:{mode} on")
-            self.gpp.wait()
-            self.gpp._sendline(f":MODE{self.n}?")
-            rv = self.gpp._expect(r'(\S+)')
-            if rv.group(1) != mode:
+            self._output(False)
+            rv = self.gpp._send_chain([
+                f":LOAD{self.n}:{mode} on",
+                "*OPC?",
+                "*ESR?",
+                f":MODE{self.n}?",
+            ], _RE_OPC_ESR_MODE)
+            self.gpp._opc_done(rv)
+            if rv.group(3) != mode.encode('ascii'):
                 raise RuntimeError(f'supply failed to switch to {mode} mode')
             self.mode = mode
         if cv is not None:
-            self.gpp._sendline(f":SOUR{self.n}:VOLT {cv}")
+            self.gpp._chain_wait([f":SOUR{self.n}:VOLT {cv}"])
         elif cc is not None:
-            self.gpp._sendline(f":SOUR{self.n}:CURR {cc}")
+            self.gpp._chain_wait([f":SOUR{self.n}:CURR {cc}"])
         elif cr is not None:
-            self.gpp._sendline(f":LOAD{self.n}:RES {cr}")
-        self.gpp.wait()
+            self.gpp._chain_wait([f":LOAD{self.n}:RES {cr}"])
         if switching:
-            self.enable()
+            self._output(True)
     
     @_locked_gpp
     def is_load(self):
         self.gpp._sendline(f":MODE{self.n}?")
-        rv = self.gpp._expect(r'(\S+)')
-        return rv.group(1) == 'CV' or rv.group(1) == 'CC' or rv.group(1) == 'CR'
+        rv = self.gpp._expect(_RE_TOKEN)
+        return rv.group(1) == b'CV' or rv.group(1) == b'CC' or rv.group(1) == b'CR'
     
     @_locked_gpp
+    @_batched_gpp
     def monitor(self, current = Monitor.NONE, voltage = Monitor.NONE, power = Monitor.NONE, trigger = 0):
+        self._status_cache = None
         self.gpp._sendline(f":MONI{self.n}:STAT OFF")
 
         # set, then clear all -- at least one must be set at all times,
@@ -168,16 +214,18 @@ class Channel:
         self.gpp._sendline(f":MONI{self.n}:STOP OUTOFF,{'ON' if trigger & Monitor.TRIG_OUTOFF else 'OFF'}")
         self.gpp._sendline(f":MONI{self.n}:STOP ALARM,{'ON' if trigger & Monitor.TRIG_ALARM  else 'OFF'}")
         self.gpp._sendline(f":MONI{self.n}:STOP BEEPER,{'ON' if trigger & Monitor.TRIG_BEEPER else 'OFF'}")
-        self.gpp.wait()
+        self.gpp._wait()
         if trigger and (current or voltage or power):
             self.gpp._sendline(f":MONI{self.n}:STAT ON")
-        self.gpp.wait()
+        self.gpp._wait()
         
         # back to the home screen
         self.gpp._sendline(':DISP:TYPE 1')
     
     @_locked_gpp
+    @_batched_gpp
     def sequence(self, seq, active = True):
+        self._status_cache = None
         self.gpp._sendline(f':SEQU{self.n}:STAT OFF')
         self.gpp._sendline(f':SEQU{self.n}:GROUP {len(seq.groups)}')
         for n,grp in enumerate(seq.groups):
@@ -188,59 +236,145 @@ class Channel:
         else:
             self.gpp._sendline(f':SEQU{self.n}:CYCLE N,{seq.cycles}')
         self.gpp._sendline(f':SEQU{self.n}:ENDS {seq.end}')
-        self.gpp.wait()
+        self.gpp._wait()
         if active:
             self.gpp._sendline(f':SEQU{self.n}:STAT ON')
-            self.gpp.wait()
+            self.gpp._wait()
 
         # back to the home screen
         self.gpp._sendline(':DISP:TYPE 1')
     
+    @_locked_gpp
     def sequence_enable(self, active = True):
+        self._status_cache = None
         self.gpp._sendline(f':SEQU{self.n}:STAT {"ON" if active else "OFF"}')
 
+# readings are kept as one array per quantity, indexed by channel - 1
 class Measurement:
     def __init__(self, parent):
         self.gpp = parent
+        self.voltage = np.empty(4, dtype=np.float64)
+        self.current = np.empty(4, dtype=np.float64)
+        self.power   = np.empty(4, dtype=np.float64)
+        self.mode    = [None] * 4
         self.update()
 
     def __repr__(self):
         return '\n'.join([
-            f"[Ch#{self.data[d]['channel']}: {self.data[d]['voltage']}V, {self.data[d]['current']}A, {self.data[d]['power']}W mode:{self.data[d]['mode']}]" for d in self.data
+            f"[Ch#{chn+1}: {self.voltage[chn]}V, {self.current[chn]}A, {self.power[chn]}W mode:{self.mode[chn]}]" for chn in range(4)
         ])
 
     @_locked_gpp
     def update(self):
-        self.gpp._sendline(":MEAS?")
-        rv = self.gpp._expect(r'([0-9.,;]+)')
-        chs = [ch.split(',') for ch in rv.group(1).split(';')]
-        self.data = {chn+1: {
-            'voltage': float(ch[0]),
-            'current': float(ch[1]),
-            'power'  : float(ch[2]),
+        # :MEAS? answers with one ';'-separated v,i,p group per channel, so
+        # the first four replies are the readings and the rest the modes
+        rv = self.gpp._bulk_query([":MEAS?"] + [f":MODE{n}?" for n in range(1, 5)], nreplies=8)
+        vals = np.fromstring(b','.join(rv[:4]), sep=',', dtype=np.float64)
+        if vals.size != 12:
+            raise GPPException(f'expected 12 values from :MEAS?, got {vals.size}')
+        vip = vals.reshape(-1, 3)
+        self.voltage[:] = vip[:, 0]
+        self.current[:] = vip[:, 1]
+        self.power[:]   = vip[:, 2]
+        self.mode[:] = [_RE_TOKEN.search(mode).group(1).decode('ascii') for mode in rv[4:]]
+        # establish the mode of channels that don't know it yet, as
+        # get_mode() would, so set_source/set_load don't needlessly take the
+        # mode-switch path and cycle the output
+        for c, m in zip(self.gpp._channels[1:], self.mode):
+            if c.mode is None:
+                c.mode = m
+
+    # the old per-channel dict layout, built on request
+    def asDict(self):
+        return {chn+1: {
+            'voltage': float(self.voltage[chn]),
+            'current': float(self.current[chn]),
+            'power'  : float(self.power[chn]),
             'channel': chn+1,
-            'mode'   : self.gpp.channel(chn+1).get_mode() } for chn,ch in enumerate(chs)
+            'mode'   : self.mode[chn] } for chn in range(4)
         }
 
-    def asDict(self):
-        return self.data
+    # copy the readings into row i of caller-owned (samples, 4) arrays, so
+    # logging loops can capture into preallocated buffers
+    def extend_into(self, i, voltage, current, power):
+        voltage[i] = self.voltage
+        current[i] = self.current
+        power[i]   = self.power
 
 
 class GPPException(Exception):
         def __init__(self, message):
             super().__init__(message)
 
+# Line-oriented file-like wrapper around the instrument socket. Replies are
+# received straight into one preallocated buffer with recv_into() rather
+# than through a makefile() reader stack, and writes are collected until
+# flush() so they leave in a single sendall(). Like the BufferedWriter it
+# replaces, the write side has its own lock, since some commands are sent
+# without holding the instrument lock.
+class _SocketTransport:
+    def __init__(self, s, bufsize=4096):
+        self.s = s
+        self.buf = bytearray(bufsize)
+        self.start = 0
+        self.end = 0
+        self.out = bytearray()
+        self.wlock = threading.Lock()
+
+    def write(self, b):
+        with self.wlock:
+            self.out += b
+
+    def flush(self):
+        with self.wlock:
+            if self.out:
+                self.s.sendall(self.out)
+                self.out.clear()
+
+    def readline(self):
+        while True:
+            i = self.buf.find(b'\n', self.start, self.end)
+            if i >= 0:
+                line = bytes(memoryview(self.buf)[self.start:i+1])
+                self.start = i + 1
+                if self.start == self.end:
+                    self.start = self.end = 0
+                return line
+            # no complete line yet; move the partial one to the front and
+            # make sure there is room for more
+            if self.start:
+                n = self.end - self.start
+                self.buf[:n] = self.buf[self.start:self.end]
+                self.start, self.end = 0, n
+            if self.end == len(self.buf):
+                self.buf.extend(bytes(len(self.buf)))
+            n = self.s.recv_into(memoryview(self.buf)[self.end:])
+            if n == 0:
+                line = bytes(memoryview(self.buf)[self.start:self.end])
+                self.start = self.end = 0
+                return line
+            self.end += n
+
 class GPP4323:
-    def __init__(self, host=None, sport=None, debug=False, timeout=5.0):
+    def __init__(self, host=None, sport=None, debug=False, timeout=5.0, low_latency=True):
+        # re-entrant so callers can hold it across several calls, e.g.
+        # `with g.lock: ch.set_source(...); ch.status()`
         self.lock = threading.RLock()
+        self._batching = False  # flushes held back while inside _batch()
+        self._channels = [None] + [Channel(self, n) for n in range(1, 5)]  # indexed by channel number
         self.debug         = debug
         self.s = None
         if host is not None:
             self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             dprint(f'Trying to connect to (host,port): {host}')
             self.s.connect(host)
+            if low_latency:
+                # SCPI traffic is all tiny request/reply lines, so don't let
+                # Nagle hold them back
+                self.s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             self.s.settimeout(timeout)
-            self.file = self.s.makefile('rwb')
+            self.file = _SocketTransport(self.s)
         elif sport is not None and sport[0] is not None and sport[1] is not None:
             dprint(f'Trying to connect to (port,speed): {sport}')
             self.s = serial.Serial(sport[0], sport[1], timeout=2)
@@ -250,14 +384,15 @@ class GPP4323:
 
         try:
             self._sendline('*IDN?')
-            rv = self._expect(r'([^,]*),([^,]*),SN:([^,]*),([^,]*)')
-            self.manufacturer = rv.group(1)
-            self.model = rv.group(2)
-            self.serial = rv.group(3)
-            self.version = rv.group(4).strip()
-            self._sendline('*CLS')
-            self._sendline(':SYST:CLE')
-            self._sendline(':STAT:QUE:ENAB (-440:+900)')
+            rv = self._expect(_RE_IDN)
+            self.manufacturer = rv.group(1).decode('ascii')
+            self.model = rv.group(2).decode('ascii')
+            self.serial = rv.group(3).decode('ascii')
+            self.version = rv.group(4).strip().decode('ascii')
+            with self._batch():
+                self._sendline('*CLS')
+                self._sendline(':SYST:CLE')
+                self._sendline(':STAT:QUE:ENAB (-440:+900)')
         except Exception as e:
             raise GPPException(repr(e))
 
@@ -269,118 +404,205 @@ class GPP4323:
         if self.s is not None:
             self.s.close()
     
+    # *OPC? only answers once all pending operations are complete, and the
+    # *ESR? chained behind it reports any errors, all in one round-trip
     def wait(self):
         with self.lock:
-            self._sendline("*OPC")
-            tries = 5
-            while tries > 0:
-                self._sendline("*ESR?")
-                val = int(self._expect(r'(\d+)').group(1))
-                if val & 128:
-                    dprint(f"NOTE: SN{self.serial} reports power cycle")
-                if val & 32:
-                    raise RuntimeError('command syntax error from supply')
-                if val & 16:
-                    raise RuntimeError('execution error from supply')
-                if val & 8:
-                    raise RuntimeError('device error from supply')
-                if val & 4:
-                    dprint(f"NOTE: SN{self.serial} reports query error")
-                if val & 1:
-                    break
-                tries -= 1
-            if tries == 0:
-                raise RuntimeError('supply never became ready')
+            self._wait()
+
+    def _wait(self):
+        self._chain_wait([])
+
+    # send commands chained into one line and return the match of the
+    # combined reply against pat
+    def _send_chain(self, cmds, pat):
+        self._sendline(';'.join(cmds))
+        return self._expect(pat)
+
+    # send commands with *OPC? and *ESR? appended, so waiting for them and
+    # checking them for errors costs no extra round-trip
+    def _chain_wait(self, cmds):
+        self._opc_done(self._send_chain(cmds + ["*OPC?", "*ESR?"], _RE_OPC_ESR))
+
+    # check the *OPC? and *ESR? replies, the first two groups of rv
+    def _opc_done(self, rv):
+        if rv is None:
+            raise RuntimeError('supply never became ready')
+        self._check_esr(int(rv.group(2)))
+        if int(rv.group(1)) != 1:
+            raise RuntimeError('supply never became ready')
+
+    # reading *ESR? clears it, so every value read must be checked here
+    def _check_esr(self, val):
+        if val & 128:
+            dprint(f"NOTE: SN{self.serial} reports power cycle")
+        if val & 32:
+            raise RuntimeError('command syntax error from supply')
+        if val & 16:
+            raise RuntimeError('execution error from supply')
+        if val & 8:
+            raise RuntimeError('device error from supply')
+        if val & 4:
+            dprint(f"NOTE: SN{self.serial} reports query error")
 
-    @functools.cache
     def channel(self, n):
-        return Channel(self, n)
+        if not 1 <= n <= 4:
+            raise ValueError(f'no channel {n}; the supply has channels 1 to 4')
+        return self._channels[n]
 
     def meas(self):
         return Measurement(self)
 
+    # configured state of several channels, returned as {channel number:
+    # status dict}. Channels whose cached status is still within their
+    # status_ttl are answered from the cache; the rest are read in one
+    # transaction and cached
+    def status(self, chans=(1,2,3,4)):
+        chs = [self.channel(n) for n in chans]
+        nf = len(Channel._STATUS_FIELDS)
+        with self.lock:
+            now = time.monotonic()
+            rv = {c.n: c._cached_status(now) for c in chs}
+            stale = [c for c in chs if rv[c.n] is None]
+            if stale:
+                replies = self._bulk_query([q for c in stale for q in c._status_queries()])
+                for i, c in enumerate(stale):
+                    st = c._parse_status(replies[i*nf:(i+1)*nf])
+                    c._status_cache = (now, st)
+                    rv[c.n] = dict(st)
+        return rv
+
+    # send several queries chained into one line and return the replies,
+    # one per ';'-separated field, in order. nreplies is the number of
+    # fields expected, by default one per query; queries such as :MEAS?
+    # that answer with several fields need it set explicitly
+    def bulk_query(self, queries, nreplies=None):
+        with self.lock:
+            return [r.decode('ascii') for r in self._bulk_query(queries, nreplies)]
+
+    # as bulk_query, but unlocked and returning the raw bytes replies
+    def _bulk_query(self, queries, nreplies=None):
+        if nreplies is None:
+            nreplies = len(queries)
+        self._sendline(';'.join(queries))
+        rv = [r.strip() for r in self._readline().split(b';')]
+        if len(rv) != nreplies:
+            raise GPPException(f'expected {nreplies} replies to {len(queries)} queries, got {len(rv)}')
+        return rv
+
     def alloff(self):
-        self._sendline("ALLOUTOFF")
+        with self.lock:
+            for c in self._channels[1:]:
+                c._status_cache = None
+            self._sendline("ALLOUTOFF")
 
     def local(self):
-        self._sendline("LOCAL")
-
-    def _expect(self, pattern):
+        with self.lock:
+            self._sendline("LOCAL")
+
+    # hold back flushing the lines sent inside the block, so they go out in
+    # one go, either on leaving the block or when a reply is needed
+    @contextlib.contextmanager
+    def _batch(self):
+        if self._batching:
+            yield
+            return
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = False
+            self.file.flush()
+
+    def _readline(self):
+        if self._batching:
+            self.file.flush()
         s = self.file.readline()
         if self.debug:
             dprint('<== ', s)
-        s = s.decode('utf-8')
-        m = re.search(pattern,s)
+        return s
+
+    def _expect(self, pat):
+        s = self._readline()
+        m = pat.search(s)
         return m
 
     def _sendline(self, l):
         if self.debug:
             dprint('==> ', l)
         self.file.write((l + '\n').encode('ascii'))
-        self.file.flush()
-
+        if not self._batching:
+            self.file.flush()
+
+
+_PARSER = None
+
+def _build_parser():
+    p = argparse.ArgumentParser(description="library and cli tool for remote control of GPP4323 PSU")
+    mug0 = p.add_mutually_exclusive_group()
+    mug0.add_argument(
+        '--host',
+        default='192.168.1.72',
+        help='hostname or IP',
+    )
+    mug0.add_argument(
+        '--serial', '-s',
+        default=None,
+        help='Serial port'
+    )
+
+    mug1 = p.add_mutually_exclusive_group()
+    mug1.add_argument(
+        '--port', '-p',
+        default=1026,
+        type=int,
+        help='host port',
+    )
+    mug1.add_argument(
+        '--speed',
+        default=115200,
+        help='Serial port speed'
+    )
+
+    p.add_argument(
+        '--debug',
+        action='store_true',
+        help='show debug strings to and from instrument'
+    )
+
+    p.add_argument(
+        '--channel', '-c',
+        default=1,
+        help='channel number to control',
+        type=int,
+        choices=(1,2,3,4),
+    )
+
+
+    s = p.add_subparsers(help='commands', dest='command')
+    s.add_parser('meas', help='report the current readings of all channels')
+    s.add_parser('stat', help='report the current status of all channels')
+
+    source_p = s.add_parser('source', help='source mode with max voltage and current')
+    source_p.add_argument('--voltage', '-v', type=float, required=True)
+    source_p.add_argument('--current', '-i', type=float, required=True)
+
+    load_p = s.add_parser('load', help='load mode as either constant voltage, current, or resistance') 
+    lp_mug0 = load_p.add_mutually_exclusive_group()
+    lp_mug0.add_argument('--voltage', '-v', type=float)
+    lp_mug0.add_argument('--current', '-i', type=float)
+    lp_mug0.add_argument('--resistance', '-r', type=float)
+
+    s.add_parser('enable', help='enable specified channel')
+    s.add_parser('disable', help='disable specified channel')
+
+    return p
 
 class CliApp():
     def getArgs(self):
-        p = argparse.ArgumentParser(description="library and cli tool for remote control of GPP4323 PSU")
-        mug0 = p.add_mutually_exclusive_group()
-        mug0.add_argument(
-            '--host',
-            default='192.168.1.72',
-            help='hostname or IP',
-        )
-        mug0.add_argument(
-            '--serial', '-s',
-            default=None,
-            help='Serial port'
-        )
-    
-        mug1 = p.add_mutually_exclusive_group()
-        mug1.add_argument(
-            '--port', '-p',
-            default=1026,
-            type=int,
-            help='host port',
-        )
-        mug1.add_argument(
-            '--speed',
-            default=115200,
-            help='Serial port speed'
-        )
-    
-        p.add_argument(
-            '--debug',
-            action='store_true',
-            help='show debug strings to and from instrument'
-        )
-    
-        p.add_argument(
-            '--channel', '-c',
-            default=1,
-            help='channel number to control',
-            type=int,
-            choices=(1,2,3,4),
-        )
-    
-    
-        s = p.add_subparsers(help='commands', dest='command')
-        s.add_parser('meas', help='report the current readings of all channels')
-        s.add_parser('stat', help='report the current status of all channels')
-    
-        source_p = s.add_parser('source', help='source mode with max voltage and current')
-        source_p.add_argument('--voltage', '-v', type=float, required=True)
-        source_p.add_argument('--current', '-i', type=float, required=True)
-    
-        load_p = s.add_parser('load', help='load mode as either constant voltage, current, or resistance') 
-        lp_mug0 = load_p.add_mutually_exclusive_group()
-        lp_mug0.add_argument('--voltage', '-v', type=float)
-        lp_mug0.add_argument('--current', '-i', type=float)
-        lp_mug0.add_argument('--resistance', '-r', type=float)
-    
-        s.add_parser('enable', help='enable specified channel')
-        s.add_parser('disable', help='disable specified channel')
-     
-        return p.parse_args()
+        global _PARSER
+        _PARSER = _PARSER or _build_parser()
+        return _PARSER.parse_args()
     
     def showMeas(self, m):
         dprint('Measurement:')
@@ -389,9 +611,7 @@ class CliApp():
     
     def showStat(self, g, chans=(1,2,3,4)):
         dprint('Status:')
-        s = {}
-        for ch in chans:
-            s[ch] = g.channel(ch).status()
+        s = g.status(chans)
         for ch, chv in s.items():
             load_mode_str = 'source'
             for load_mode in ('cv', 'cc', 'cr'):